@@ -702,17 +702,43 @@ then
 
 					printf '' > "${JOB_CONTROLE_FILE_BASE}.started"
 
-					checkIfRawDataFolderExists=$(rsync -e 'ssh -p 443' "${HOSTNAME_DATA_STAGING}::${GENOMESCAN_HOME_DIR}/${gsBatch}/")
-					if [[ "${checkIfRawDataFolderExists}" == *"${analysisFolder}"* ]]
+					#
+					# Only start the transfer once the upload to the data staging server is complete:
+					# all *.md5sum files are present and each file listed therein
+					# has the same size and modification time as during the previous run of this script.
+					# The listing of the previous run is kept in the snapshot file; once the batch is ready,
+					# checkBatchArrival.py no longer lists the remote data.
+					# checkBatchArrival.py also reports when the ${analysisFolder} folder does not exist,
+					# so we do not need a separate listing of the batch to check that.
+					# When a batch did not change for 48 runs of this script while it was not yet complete,
+					# e.g. because files listed in the checksum file(s) never arrive, checkBatchArrival.py fails.
+					#
+					batchArrivalExitStatus='0'
+					checkBatchArrival.py \
+						--source "${HOSTNAME_DATA_STAGING}::${GENOMESCAN_HOME_DIR}/${gsBatch}/${analysisFolder}/" \
+						--snapshot "${controlFileBase}.${analysisFolder}_batchArrival.snapshot" \
+						--checksums '*.md5sum' \
+						--maxStalledPolls '48' \
+						2>> "${JOB_CONTROLE_FILE_BASE}.started" \
+						|| batchArrivalExitStatus="${?}"
+					if [[ "${batchArrivalExitStatus}" -eq '0' ]]
 					then
 						gsBatchUploadCompleted='true'
 						logTimeStamp=$(date '+%Y-%m-%d-T%H%M')
-							rsync -e 'ssh -p 443' "${HOSTNAME_DATA_STAGING}::${GENOMESCAN_HOME_DIR}/${gsBatch}/${analysisFolder}/" \
-							> "${logDir}/${gsBatch}.uploadCompletedListing_${logTimeStamp}.log"
-					else
+						cp "${controlFileBase}.${analysisFolder}_batchArrival.snapshot" "${logDir}/${gsBatch}.uploadCompletedListing_${logTimeStamp}.log"
+					elif [[ "${batchArrivalExitStatus}" -eq '1' ]]
+					then
+						log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' "Upload of ${gsBatch} is not yet complete or not yet stable: skipping."
+						continue
+					elif [[ "${batchArrivalExitStatus}" -eq '3' ]]
+					then
 						log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" '0' "There is no Analysis folder, skipping"
 						mv "${JOB_CONTROLE_FILE_BASE}."{started,failed}
 						continue
+					else
+						log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" "${batchArrivalExitStatus}" "Failed to check if upload of ${gsBatch} is complete. See ${JOB_CONTROLE_FILE_BASE}.failed for details."
+						mv "${JOB_CONTROLE_FILE_BASE}."{started,failed}
+						continue
 					fi
 				else
 					log4Bash 'WARN' "${LINENO}" "${FUNCNAME:-main}" '0' "${GENOMESCAN_HOME_DIR}/${gsBatch}/${gsBatch}.finished does not exist"
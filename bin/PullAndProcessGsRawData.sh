@@ -1018,16 +1018,41 @@ then
 					gsBatchUploadCompleted='false'
 					if rsync -e 'ssh -p 443' "${HOSTNAME_DATA_STAGING}::${GENOMESCAN_HOME_DIR}/${gsBatch}/${gsBatch}.finished" 2>/dev/null
 					then
-						checkIfRawDataFolderExists=$(rsync -e 'ssh -p 443' "${HOSTNAME_DATA_STAGING}::${GENOMESCAN_HOME_DIR}/${gsBatch}/")
-						if [[ "${checkIfRawDataFolderExists}" == *"${rawdataFolder}"* ]]
+						#
+						# Only start the transfer once the upload to the data staging server is complete:
+						# checksums.md5 is present and each file listed therein
+						# has the same size and modification time as during the previous run of this script.
+						# The listing of the previous run is kept in the snapshot file; once the batch is ready,
+						# checkBatchArrival.py no longer lists the remote data.
+						# checkBatchArrival.py also reports when the ${rawdataFolder} folder does not exist,
+						# so we do not need a separate listing of the batch to check that.
+						# When a batch did not change for 48 runs of this script while it was not yet complete,
+						# e.g. because files listed in the checksum file(s) never arrive, checkBatchArrival.py fails.
+						#
+						batchArrivalExitStatus='0'
+						checkBatchArrival.py \
+							--source "${HOSTNAME_DATA_STAGING}::${GENOMESCAN_HOME_DIR}/${gsBatch}/${rawdataFolder}/" \
+							--snapshot "${controlFileBase}.${rawdataFolder}_batchArrival.snapshot" \
+							--maxStalledPolls '48' \
+							2>> "${JOB_CONTROLE_FILE_BASE}.started" \
+							|| batchArrivalExitStatus="${?}"
+						if [[ "${batchArrivalExitStatus}" -eq '0' ]]
 						then
 							gsBatchUploadCompleted='true'
 							logTimeStamp=$(date '+%Y-%m-%d-T%H%M')
-							rsync -e 'ssh -p 443' "${HOSTNAME_DATA_STAGING}::${GENOMESCAN_HOME_DIR}/${gsBatch}/${rawdataFolder}/" \
-							> "${logDir}/${gsBatch}.uploadCompletedListing_${logTimeStamp}.log"
-						else
+							cp "${controlFileBase}.${rawdataFolder}_batchArrival.snapshot" "${logDir}/${gsBatch}.uploadCompletedListing_${logTimeStamp}.log"
+						elif [[ "${batchArrivalExitStatus}" -eq '1' ]]
+						then
+							log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' "Upload of ${gsBatch} is not yet complete or not yet stable: skipping."
+							continue
+						elif [[ "${batchArrivalExitStatus}" -eq '3' ]]
+						then
 							log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' "There is no Raw_data folder, skipping"
 							continue
+						else
+							log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" "${batchArrivalExitStatus}" "Failed to check if upload of ${gsBatch} is complete. See ${JOB_CONTROLE_FILE_BASE}.failed for details."
+							mv "${JOB_CONTROLE_FILE_BASE}."{started,failed}
+							continue
 						fi
 					else
 						log4Bash 'WARN' "${LINENO}" "${FUNCNAME:-main}" '0' "${GENOMESCAN_HOME_DIR}/${gsBatch}/${gsBatch}.finished does not exist"
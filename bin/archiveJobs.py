@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import gzip
+import zlib
+import bisect
+import fnmatch
+import hashlib
+import tarfile
+import argparse
+import logging
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+#
+## functions
+#
+
+#
+# Compress one block of the tar stream into a self contained gzip member or zstd frame.
+# Concatenated gzip members are a valid gzip file and concatenated zstd frames a valid zstd file,
+# so the archive can be unpacked with the regular tar -xzf or tar --zstd -xf commands.
+# Both zlib and zstandard release the GIL while compressing, so blocks are compressed in parallel by the thread pool.
+#
+def compressBlock(_block, _format, _level):
+    if _format == 'zstd':
+        return zstandard.ZstdCompressor(level=_level).compress(_block)
+    _compressor = zlib.compressobj(_level, zlib.DEFLATED, 31)
+    return _compressor.compress(_block) + _compressor.flush()
+
+def decompressBlock(_compressedBlock, _format):
+    if _format == 'zstd':
+        return zstandard.ZstdDecompressor().decompress(_compressedBlock)
+    return zlib.decompress(_compressedBlock, 31)
+
+#
+# File like object that tarfile writes the uncompressed tar stream to.
+# The stream is cut in blocks of _blockSize bytes, which are compressed in a thread pool
+# and written in order to _fileHandle. The offsets of all blocks are recorded for the index.
+#
+class BlockCompressingWriter(object):
+    def __init__(self, _fileHandle, _format, _level, _threads, _blockSize):
+        self.fileHandle = _fileHandle
+        self.format = _format
+        self.level = _level
+        self.threads = _threads
+        self.blockSize = _blockSize
+        self.executor = ThreadPoolExecutor(max_workers=_threads)
+        self.pending = deque()
+        self.buffer = bytearray()
+        self.uncompressedOffset = 0
+        self.compressedOffset = 0
+        #
+        # List of (uncompressedOffset, uncompressedSize, compressedOffset, compressedSize) tuples.
+        #
+        self.blocks = []
+
+    def write(self, _data):
+        self.buffer += _data
+        while len(self.buffer) >= self.blockSize:
+            self._submit(bytes(self.buffer[:self.blockSize]))
+            del self.buffer[:self.blockSize]
+        return len(_data)
+
+    def _submit(self, _block):
+        self.pending.append((len(_block), self.executor.submit(compressBlock, _block, self.format, self.level)))
+        #
+        # Limit the amount of blocks kept in memory.
+        #
+        while len(self.pending) > 2 * self.threads:
+            self._writeOldest()
+
+    def _writeOldest(self):
+        _uncompressedSize, _future = self.pending.popleft()
+        _compressedBlock = _future.result()
+        self.fileHandle.write(_compressedBlock)
+        self.blocks.append((self.uncompressedOffset, _uncompressedSize, self.compressedOffset, len(_compressedBlock)))
+        self.uncompressedOffset += _uncompressedSize
+        self.compressedOffset += len(_compressedBlock)
+
+    def close(self):
+        if self.buffer:
+            self._submit(bytes(self.buffer))
+            self.buffer = bytearray()
+        while self.pending:
+            self._writeOldest()
+        self.executor.shutdown()
+
+#
+# Walk _inputDir and yield the paths of all dirs and files to archive in the order they are archived.
+# Files and dirs with a name matching one of the _excludes patterns are skipped,
+# so an archive from a previous run that was left in _inputDir does not end up inside the new one.
+#
+def walkInputDir(_inputDir, _archivePath, _excludes):
+    for _dirPath, _dirs, _files in os.walk(_inputDir):
+        _dirs.sort()
+        for _name in sorted(_dirs) + sorted(_files):
+            _path = os.path.join(_dirPath, _name)
+            if os.path.abspath(_path) == os.path.abspath(_archivePath):
+                continue
+            if any(fnmatch.fnmatch(_name, _pattern) for _pattern in _excludes):
+                logging.debug('Skipping ' + _path + ': matches an --exclude pattern.')
+                if _name in _dirs:
+                    _dirs.remove(_name)
+                continue
+            yield _path
+
+#
+# Check if _inputDir contains anything else than (excluded) dirs.
+#
+def hasFilesToArchive(_inputDir, _archivePath, _excludes):
+    return any(os.path.islink(_path) or not os.path.isdir(_path) for _path in walkInputDir(_inputDir, _archivePath, _excludes))
+
+#
+# Create a tar archive of all content of _inputDir similar to: tar -czf _archivePath -C _inputDir .
+# Returns the list of archived files and the member index:
+#     [(name, dataOffset, size), ...]
+# where dataOffset is the offset of the member's data in the uncompressed tar stream.
+#
+def createArchive(_inputDir, _archivePath, _format, _level, _threads, _blockSize, _excludes):
+    _archivedFiles = []
+    _members = []
+    with open(_archivePath, 'wb') as _archiveFileHandle:
+        _writer = BlockCompressingWriter(_archiveFileHandle, _format, _level, _threads, _blockSize)
+        with tarfile.open(fileobj=_writer, mode='w|', format=tarfile.GNU_FORMAT) as _tar:
+            _tar.add(_inputDir, arcname='.', recursive=False)
+            for _path in walkInputDir(_inputDir, _archivePath, _excludes):
+                _arcname = './' + os.path.relpath(_path, _inputDir)
+                _tarInfo = _tar.gettarinfo(_path, arcname=_arcname)
+                if _tarInfo is None:
+                    logging.warning('Skipping ' + _path + ': unsupported file type.')
+                    continue
+                if _tarInfo.isreg():
+                    with open(_path, 'rb') as _fileHandle:
+                        _tar.addfile(_tarInfo, _fileHandle)
+                    #
+                    # The data of a member is padded to a multiple of the tar block size (512 bytes)
+                    # and ends at the current offset of the tar stream.
+                    #
+                    _paddedSize = -(-_tarInfo.size // tarfile.BLOCKSIZE) * tarfile.BLOCKSIZE
+                    _members.append((_arcname, _tar.offset - _paddedSize, _tarInfo.size))
+                else:
+                    _tar.addfile(_tarInfo)
+                if not _tarInfo.isdir():
+                    _archivedFiles.append((_path, _tarInfo))
+        _writer.close()
+    return _archivedFiles, _writer.blocks, _members
+
+#
+# Write the index next to the archive as tab separated lines:
+#     block   uncompressedOffset  uncompressedSize  compressedOffset  compressedSize
+#     member  name                dataOffset        size
+#
+def writeIndex(_indexPath, _format, _blocks, _members):
+    with open(_indexPath, 'w') as _indexFileHandle:
+        _indexFileHandle.write('format\t' + _format + '\n')
+        for _block in _blocks:
+            _indexFileHandle.write('block\t' + '\t'.join(str(_value) for _value in _block) + '\n')
+        for _name, _dataOffset, _size in _members:
+            _indexFileHandle.write('member\t' + _name + '\t' + str(_dataOffset) + '\t' + str(_size) + '\n')
+
+def readIndex(_indexPath):
+    _format = 'gzip'
+    _blocks = []
+    _members = {}
+    with open(_indexPath, 'r') as _indexFileHandle:
+        for _line in _indexFileHandle:
+            _fields = _line.rstrip('\n').split('\t')
+            if _fields[0] == 'format':
+                _format = _fields[1]
+            elif _fields[0] == 'block':
+                _blocks.append(tuple(int(_value) for _value in _fields[1:]))
+            elif _fields[0] == 'member':
+                _members[_fields[1]] = (int(_fields[2]), int(_fields[3]))
+    return _format, _blocks, _members
+
+#
+# Extract the data of a single member by decompressing only the blocks it spans.
+#
+def extractMember(_archivePath, _indexPath, _name):
+    _format, _blocks, _members = readIndex(_indexPath)
+    if not _name.startswith('./'):
+        _name = './' + _name
+    if _name not in _members:
+        logging.critical('Cannot find ' + _name + ' in index ' + _indexPath + '.')
+        sys.exit('FATAL ERROR!')
+    _dataOffset, _size = _members[_name]
+    _blockStarts = [_block[0] for _block in _blocks]
+    _first = max(bisect.bisect_right(_blockStarts, _dataOffset) - 1, 0)
+    _data = bytearray()
+    with open(_archivePath, 'rb') as _archiveFileHandle:
+        for _uncompressedOffset, _uncompressedSize, _compressedOffset, _compressedSize in _blocks[_first:]:
+            if _uncompressedOffset >= _dataOffset + _size:
+                break
+            _archiveFileHandle.seek(_compressedOffset)
+            _data += decompressBlock(_archiveFileHandle.read(_compressedSize), _format)
+    _start = _dataOffset - _blocks[_first][0] if _blocks else 0
+    return bytes(_data[_start:_start + _size])
+
+#
+# Verify the archive by reading it back as a regular tar stream
+# and comparing the type, size and MD5 checksum of each member with the original.
+#
+def md5(_fileHandle):
+    _hash = hashlib.md5()
+    for _chunk in iter(lambda: _fileHandle.read(1024 * 1024), b''):
+        _hash.update(_chunk)
+    return _hash.hexdigest()
+
+def verifyArchive(_archivePath, _format, _archivedFiles):
+    _expected = {}
+    for _path, _tarInfo in _archivedFiles:
+        _expected[_tarInfo.name] = (_path, _tarInfo)
+    _seen = set()
+    with open(_archivePath, 'rb') as _archiveFileHandle:
+        if _format == 'zstd':
+            _stream = zstandard.ZstdDecompressor().stream_reader(_archiveFileHandle, read_across_frames=True)
+        else:
+            _stream = gzip.GzipFile(fileobj=_archiveFileHandle, mode='rb')
+        _tar = tarfile.open(fileobj=_stream, mode='r|')
+        for _member in _tar:
+            if _member.name not in _expected:
+                continue
+            _path, _tarInfo = _expected[_member.name]
+            if _member.type != _tarInfo.type or _member.size != _tarInfo.size:
+                logging.error('Type or size of ' + _member.name + ' in archive differs from ' + _path + '.')
+                return False
+            if _member.isreg():
+                with open(_path, 'rb') as _fileHandle:
+                    if md5(_tar.extractfile(_member)) != md5(_fileHandle):
+                        logging.error('Checksum of ' + _member.name + ' in archive differs from ' + _path + '.')
+                        return False
+            _seen.add(_member.name)
+        _tar.close()
+    _missing = set(_expected) - _seen
+    if _missing:
+        logging.error('Missing from archive: ' + ', '.join(sorted(_missing)) + '.')
+        return False
+    return True
+
+#
+# Remove the archived originals; directories are only removed when they are empty afterwards.
+#
+def removeOriginals(_inputDir, _archivedFiles):
+    for _path, _tarInfo in _archivedFiles:
+        os.remove(_path)
+    for _dirPath, _dirs, _files in os.walk(_inputDir, topdown=False):
+        if _dirPath != _inputDir and not os.listdir(_dirPath):
+            os.rmdir(_dirPath)
+
+#
+##
+### Main
+##
+#
+
+#
+# Get commandline parameters.
+#
+parser = argparse.ArgumentParser(description='Archive a dir with many small files (e.g. a jobs dir) into a tar file compressed in parallel blocks.')
+subparsers = parser.add_subparsers(dest='command')
+subparsers.required = True
+createParser = subparsers.add_parser('create', help='Create archive plus index (<archive>.index) and optionally remove the originals.')
+createParser.add_argument("--dir", required=True, help='Dir to archive; its content is stored relative to this dir like tar -C dir . does.')
+createParser.add_argument("--output", required=True, help='Archive to create; e.g. project_jobs.tar.gz or project_jobs.tar.zst.')
+createParser.add_argument("--zstd", action='store_true', help='Compress with zstd instead of gzip (requires the zstandard Python module).')
+createParser.add_argument("--level", type=int, required=False, help='Compression level (default: 6 for gzip and 3 for zstd).')
+createParser.add_argument("--threads", type=int, required=False, default=4, help='Number of threads used for compression (default: 4).')
+createParser.add_argument("--blockSize", type=int, required=False, default=4 * 1024 * 1024, help='Size of uncompressed blocks in bytes (default: 4 MiB).')
+createParser.add_argument("--exclude", action='append', required=False, default=[], help='Skip files and dirs with a name matching this pattern; can be used multiple times (e.g. --exclude \'*_jobs.tar.gz*\').')
+createParser.add_argument("--removeOriginals", action='store_true', help='Remove the archived files after the archive was verified.')
+extractParser = subparsers.add_parser('extract', help='Write the content of a single member to STDOUT using the index.')
+extractParser.add_argument("--archive", required=True, help='Archive created with the create command.')
+extractParser.add_argument("--member", required=True, help='Path of the member relative to the archived dir.')
+for subparser in (createParser, extractParser):
+    subparser.add_argument("--logLevel" , required=False, default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])
+args = parser.parse_args()
+#
+# Initialize logging; log to STDERR as STDOUT may be used for extracted data.
+#
+numericLogLevel = getattr(logging, args.logLevel.upper(), None)
+if not isinstance(numericLogLevel, int):
+    raise ValueError('Invalid log level specified with --logLevel: %s' % args.logLevel)
+logging.basicConfig(stream=sys.stderr, level=numericLogLevel, format='%(filename)s %(asctime)s %(levelname)s @ L:%(lineno)d> %(message)s')
+
+if args.command == 'extract':
+    indexFormat = readIndex(args.archive + '.index')[0]
+    if indexFormat == 'zstd' and zstandard is None:
+        logging.critical('Archive ' + args.archive + ' was compressed with zstd, but the zstandard Python module is not available.')
+        sys.exit('FATAL ERROR!')
+    sys.stdout.buffer.write(extractMember(args.archive, args.archive + '.index', args.member))
+    sys.exit(0)
+
+#
+# Create.
+#
+if not os.path.isdir(args.dir):
+    logging.critical(args.dir + ' is not a valid dir.')
+    sys.exit('FATAL ERROR!')
+if args.zstd and zstandard is None:
+    logging.critical('Cannot use --zstd: the zstandard Python module is not available.')
+    sys.exit('FATAL ERROR!')
+compressionFormat = 'zstd' if args.zstd else 'gzip'
+compressionLevel = args.level if args.level is not None else (3 if args.zstd else 6)
+#
+# Do not create an empty archive, e.g. when only an archive of a previous run is left in the dir.
+#
+if not hasFilesToArchive(args.dir, args.output, args.exclude):
+    logging.warning('Nothing to archive in ' + args.dir + ': no archive created.')
+    sys.exit(0)
+logging.info('Archiving ' + args.dir + ' to ' + args.output + ' using ' + compressionFormat + ' with ' + str(args.threads) + ' threads ...')
+archivedFiles, blocks, members = createArchive(args.dir, args.output, compressionFormat, compressionLevel, args.threads, args.blockSize, args.exclude)
+writeIndex(args.output + '.index', compressionFormat, blocks, members)
+logging.info('Archived ' + str(len(archivedFiles)) + ' files in ' + str(len(blocks)) + ' compressed blocks.')
+if not verifyArchive(args.output, compressionFormat, archivedFiles):
+    logging.critical('Verification of ' + args.output + ' failed: originals were NOT removed.')
+    sys.exit('FATAL ERROR!')
+logging.info('Verified ' + args.output + '.')
+if args.removeOriginals:
+    removeOriginals(args.dir, archivedFiles)
+    logging.info('Removed ' + str(len(archivedFiles)) + ' archived originals from ' + args.dir + '.')
@@ -80,6 +80,9 @@ function calculateMd5() {
 	local _project
 	local _run
 	local _controlFileBase
+	local _jobsDir
+	local _resultsDir
+	local _archiveName
 	_project="${1}"
 	_run="${2}"
 	_controlFileBase="${TMP_ROOT_DIR}/logs/${_project}/${_run}"
@@ -102,23 +105,66 @@ function calculateMd5() {
 	fi
 	
 	
-	if [[ -e "${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/jobs/" ]]
+	#
+	# zip all files in jobs folder to ${_project}_jobs.tar.gz"
+	#  * The archive is gzip compatible, but compressed in blocks by multiple threads.
+	#  * The ${_project}_jobs.tar.gz.index file lists the offsets of all members,
+	#    so a single job log can be extracted later with:
+	#        archiveJobs.py extract --archive ${_project}_jobs.tar.gz --member <job>.out
+	#  * Originals are only removed after the archive was verified.
+	#  * When a previous run already archived the jobs folder, only the archive(s) and index(es) are left:
+	#    do not archive the archive again. Archives created by older versions of this script
+	#    with tar -czvf have no index, so only check for ${_project}_jobs*.tar.gz[.index] files.
+	#    When new job files were added to the jobs folder afterwards,
+	#    archives from previous runs are excluded and the new files are archived with a timestamp in the name,
+	#    so the existing archive is not overwritten.
+	#
+	_jobsDir="${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/jobs"
+	_resultsDir="${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/results"
+	_archiveName="${_project}_jobs.tar.gz"
+	if [[ -e "${_jobsDir}/" ]] \
+		&& [[ -z "$(find "${_jobsDir}/" -mindepth 1 -maxdepth 1 ! -name "${_project}_jobs*.tar.gz" ! -name "${_project}_jobs*.tar.gz.index" -print -quit)" ]]
+	then
+		log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' \
+			"Found no files other than archives of previous runs in ${_jobsDir}/: skipping archiving."
+	elif [[ -e "${_jobsDir}/" ]]
 	then
+		if [[ -e "${_jobsDir}/${_archiveName}" ]]
+		then
+			_archiveName="${_project}_jobs_$(date '+%Y-%m-%d-%H%M%S').tar.gz"
+		fi
+		log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' \
+			"zip all files in jobs folder to ${_jobsDir}/${_archiveName} and removing originals" \
+			2>&1 | tee "${JOB_CONTROLE_FILE_BASE}.started"
+		archiveJobs.py create \
+			--dir "${_jobsDir}/" \
+			--output "${_resultsDir}/${_archiveName}" \
+			--exclude "${_project}_jobs*.tar.gz" \
+			--exclude "${_project}_jobs*.tar.gz.index" \
+			--removeOriginals \
+			2>> "${JOB_CONTROLE_FILE_BASE}.started" \
+		|| {
+			log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" "${?}" \
+				"Failed to archive ${_jobsDir}/. See ${JOB_CONTROLE_FILE_BASE}.failed for details." \
+				2>&1 | tee -a "${JOB_CONTROLE_FILE_BASE}.started"
+			rm -f "${_resultsDir}/${_archiveName}"{,.index}
+			mv "${JOB_CONTROLE_FILE_BASE}."{started,failed}
+			return
+		}
 		#
-		# zip all files in jobs folder to ${_project}_jobs.tar.gz"
+		# archiveJobs.py does not create an archive when there was nothing to archive.
 		#
-		log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' \
-			"zip all files in jobs folder to ${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/jobs/${_project}_jobs.tar.gz and removing originals"
-		tar -czvf "${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/results/${_project}_jobs.tar.gz" -C "${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/jobs/" .
-		rm -f "${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/jobs/"*
-		mv "${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/results/${_project}_jobs.tar.gz" "${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/jobs/"
+		if [[ -e "${_resultsDir}/${_archiveName}" ]]
+		then
+			mv "${_resultsDir}/${_archiveName}"{,.index} "${_jobsDir}/"
+		fi
 	fi
 	#
 	# All checks passed: start computing checksums.
 	#
 	log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' \
 		"Creating checksums for ${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/${_run}/ ... " \
-		2>&1 | tee "${JOB_CONTROLE_FILE_BASE}.started"
+		2>&1 | tee -a "${JOB_CONTROLE_FILE_BASE}.started"
 	cd "${TMP_ROOT_DIR}/projects/${pipeline}/${_project}/" \
 		|| {
 			log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" "${?}" \
@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+
+import csv
+import sys
+import argparse
+import logging
+from collections import defaultdict
+#
+# NumPy is imported here, but only checked after parsing the commandline,
+# so a missing NumPy is reported in the log file like any other error.
+#
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+#
+## constants
+#
+
+#
+# Nucleotides are encoded as small integers, so pairwise comparisons can be done on NumPy arrays.
+#  * An N in an index matches anything: it cannot be used to distinguish samples.
+#  * PAD fills the positions beyond the end of indexes that are shorter than the longest one in a lane.
+#    Positions that are PAD for either of two indexes are not compared: with mixed index lengths
+#    the demultiplexer can only use the overlapping part of the indexes to tell samples apart.
+#
+N = 4
+PAD = 5
+
+def makeBaseCodes():
+    _baseCodes = np.full(256, 255, dtype=np.uint8)
+    for _code, _base in enumerate(b'ACGT'):
+        _baseCodes[_base] = _code
+    _baseCodes[ord('N')] = N
+    _baseCodes[0] = PAD
+    return _baseCodes
+
+#
+## functions
+#
+
+#
+# Get the index1 and index2 sequences for a samplesheet row.
+# Use the barcode1 and barcode2 columns (as added by createInhouseSamplesheetFromGS.py) when present,
+# otherwise split the dash separated barcode column (e.g. CTCTCTAC-AGAGGATA).
+# Returns empty strings for samples without an index (barcode 'None').
+#
+def getIndexes(_row):
+    _barcode1 = (_row.get('barcode1') or '').strip()
+    _barcode2 = (_row.get('barcode2') or '').strip()
+    if _barcode1 == '' and _barcode2 == '':
+        _barcodes = (_row.get('barcode') or '').strip().split('-')
+        _barcode1 = _barcodes[0]
+        _barcode2 = _barcodes[1] if len(_barcodes) > 1 else ''
+    _indexes = []
+    for _barcode in (_barcode1, _barcode2):
+        if _barcode.upper() == 'NONE':
+            _barcode = ''
+        _indexes.append(_barcode.upper())
+    return _indexes[0], _indexes[1]
+
+#
+# Encode a list of index sequences into a 2D uint8 array with one row per index.
+# Indexes shorter than the longest one are padded with PAD.
+#
+def encodeIndexes(_indexes):
+    _maxLength = max([len(_index) for _index in _indexes] + [1])
+    _raw = np.array([_index.encode('ascii') for _index in _indexes], dtype='S' + str(_maxLength))
+    return BASE_CODES[_raw.view(np.uint8).reshape(len(_indexes), _maxLength)]
+
+#
+# Compute the Hamming distances between all pairs of encoded indexes.
+# Only positions where both indexes have a real nucleotide (not N and not PAD) are compared.
+#
+def pairwiseDistances(_encoded):
+    _a = _encoded[:, None, :]
+    _b = _encoded[None, :, :]
+    _compared = (_a < N) & (_b < N)
+    return np.count_nonzero((_a != _b) & _compared, axis=2)
+
+#
+# Find all pairs of samples in a lane that the demultiplexer cannot reliably tell apart.
+# When up to _mismatches mismatches are allowed per index, a read can be assigned to both samples
+# of a pair as soon as the distance for every index is at most 2 * _mismatches.
+# Returns a list of (i, j, distanceIndex1, distanceIndex2) tuples with i < j.
+#
+def findCollisions(_indexes1, _indexes2, _mismatches):
+    _distances1 = pairwiseDistances(encodeIndexes(_indexes1))
+    _distances2 = pairwiseDistances(encodeIndexes(_indexes2))
+    _colliding = np.triu((_distances1 <= 2 * _mismatches) & (_distances2 <= 2 * _mismatches), k=1)
+    _collisions = []
+    for _i, _j in zip(*np.nonzero(_colliding)):
+        _collisions.append((int(_i), int(_j), int(_distances1[_i, _j]), int(_distances2[_i, _j])))
+    return _collisions
+
+#
+# Write the log file and exit:
+#  * 0: no collisions; the log file contains OKAY.
+#  * 1: collisions or other problems with the samplesheet; the log file contains the list of errors.
+#  * 2: the check itself failed (e.g. NumPy missing or unreadable samplesheet); the log file contains the reason.
+#
+def writeLogAndExit(_logPath, _listOfErrors, _exitCode):
+    with open(_logPath, 'w') as _logFileHandle:
+        if _listOfErrors:
+            print('\n'.join(_listOfErrors))
+            _logFileHandle.write('\n'.join(_listOfErrors))
+        else:
+            _logFileHandle.write('OKAY')
+    sys.exit(_exitCode)
+
+#
+##
+### Main
+##
+#
+
+#
+# Get commandline parameters.
+#
+parser = argparse.ArgumentParser(description='Check for samples in the same lane with indexes that are too similar to demultiplex: '
+                                             'exits with 0 when OKAY, with 1 for collisions and with 2 when the check itself failed.')
+parser.add_argument("--input", required=True, help='Samplesheet with lane and barcode or barcode1/barcode2 columns.')
+parser.add_argument("--log", required=True, help='Log file: contains OKAY when no collisions were found or the list of errors otherwise.')
+parser.add_argument("--mismatches", type=int, required=False, default=1, help='Number of mismatches allowed per index during demultiplexing (default: 1).')
+parser.add_argument("--sep", required=False, default=',', help='Samplesheet field separator (default: ,).')
+parser.add_argument("--logLevel" , required=False, default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])
+args = parser.parse_args()
+#
+# Initialize logging.
+#
+numericLogLevel = getattr(logging, args.logLevel.upper(), None)
+if not isinstance(numericLogLevel, int):
+    raise ValueError('Invalid log level specified with --logLevel: %s' % args.logLevel)
+logging.basicConfig(level=numericLogLevel, format='%(filename)s %(asctime)s %(levelname)s @ L:%(lineno)d> %(message)s')
+logging.info('Checking for barcode collisions in ' + args.input + ' ...')
+if np is None:
+    logging.critical('Cannot import NumPy: load a module providing NumPy first.')
+    writeLogAndExit(args.log, ['ERROR: Cannot check barcode collisions: NumPy is not available.'], 2)
+BASE_CODES = makeBaseCodes()
+
+try:
+
+    #
+    # Group samples per flowcell and lane.
+    #
+    # Example data structure of samplesPerLane:
+    # defaultdict(<type 'list'>, {
+    #    ('HYKGJBBXX', '1'): [{'line': 2, 'sample': 'DNA12345', 'index1': 'CTCTCTAC', 'index2': 'AGAGGATA'}, ...]})
+    #
+    listOfErrors = []
+    samplesPerLane = defaultdict(list)
+    with open(args.input, 'r') as samplesheetFileHandle:
+        reader = csv.DictReader(samplesheetFileHandle, delimiter=args.sep)
+        if reader.fieldnames is None or 'lane' not in reader.fieldnames:
+            listOfErrors.append('ERROR: Required column is missing: lane.')
+        else:
+            for number, row in enumerate(reader, 2):
+                index1, index2 = getIndexes(row)
+                if (index1 + index2).strip('ACGTN') != '':
+                    listOfErrors.append('ERROR on line ' + str(number) + ': barcode ' + index1 + '-' + index2 + ' contains characters other than A, C, G, T or N.')
+                    continue
+                samplesPerLane[(row.get('flowcell') or '', row.get('lane') or '')].append({
+                    'line': number,
+                    'sample': row.get('externalSampleID') or 'line ' + str(number),
+                    'index1': index1,
+                    'index2': index2,
+                })
+
+    #
+    # Check each lane.
+    #
+    for (flowcell, lane), samples in sorted(samplesPerLane.items()):
+        if len(samples) < 2:
+            continue
+        #
+        # A sample without any index cannot be demultiplexed from the others in the same lane:
+        # report it once instead of as a collision with each of the other samples.
+        #
+        for sample in samples:
+            if sample['index1'] == '' and sample['index2'] == '':
+                listOfErrors.append('ERROR on line ' + str(sample['line']) + ': sample ' + sample['sample'] + ' has no barcode, '
+                                    + 'but shares flowcell ' + flowcell + ' lane ' + lane + ' with ' + str(len(samples) - 1) + ' other samples.')
+        samples = [sample for sample in samples if sample['index1'] != '' or sample['index2'] != '']
+        collisions = findCollisions([sample['index1'] for sample in samples], [sample['index2'] for sample in samples], args.mismatches)
+        logging.debug('Checked ' + str(len(samples)) + ' samples in flowcell ' + flowcell + ' lane ' + lane + ': found ' + str(len(collisions)) + ' collisions.')
+        for i, j, distance1, distance2 in collisions:
+            listOfErrors.append('ERROR on lines ' + str(samples[i]['line']) + ' and ' + str(samples[j]['line'])
+                                + ': barcode collision in flowcell ' + flowcell + ' lane ' + lane + ' for samples '
+                                + samples[i]['sample'] + ' (' + samples[i]['index1'] + '-' + samples[i]['index2'] + ') and '
+                                + samples[j]['sample'] + ' (' + samples[j]['index1'] + '-' + samples[j]['index2'] + '): '
+                                + 'distance index1=' + str(distance1) + ', index2=' + str(distance2)
+                                + ' while ' + str(args.mismatches) + ' mismatches are allowed per index.')
+except Exception as err:
+    logging.exception('Failed to check barcode collisions in ' + args.input + '.')
+    writeLogAndExit(args.log, ['ERROR: Failed to check barcode collisions in ' + args.input + ': ' + repr(err)], 2)
+
+if listOfErrors:
+    writeLogAndExit(args.log, listOfErrors, 1)
+else:
+    logging.info('No barcode collisions found.')
+    writeLogAndExit(args.log, [], 0)
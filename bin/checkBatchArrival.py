@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+import os
+import re
+import sys
+import fnmatch
+import argparse
+import logging
+import tempfile
+import subprocess
+
+#
+## constants
+#
+
+#
+# Exit statuses; the Pull scripts handle each of these differently.
+#
+EXIT_READY = 0
+EXIT_WAITING = 1
+EXIT_ERROR = 2
+EXIT_SOURCE_MISSING = 3
+
+#
+## functions
+#
+
+#
+# Get a listing of all files in _source as a dict:
+#     {'relative/path': 'size\tmtime', ...}
+# _source is either a local dir or a remote location that rsync can list (e.g. host::module/path/).
+# Hidden files are skipped: these may be temporary files of an rsync upload that is still in progress.
+#
+def isHidden(_relPath):
+    return any(_component.startswith('.') for _component in _relPath.split('/'))
+
+def isRemote(_source):
+    return '::' in _source or ':' in _source.split('/')[0]
+
+def listLocal(_sourceDir):
+    _listing = {}
+    for _dirPath, _dirs, _files in os.walk(_sourceDir):
+        for _file in _files:
+            _path = os.path.join(_dirPath, _file)
+            _relPath = os.path.relpath(_path, _sourceDir)
+            if isHidden(_relPath) or not os.path.isfile(_path):
+                continue
+            _stat = os.stat(_path)
+            _listing[_relPath] = str(_stat.st_size) + '\t' + str(int(_stat.st_mtime))
+    return _listing
+
+#
+# Example line of rsync --list-only output:
+#     -rw-r--r--  1,234,567,890 2023/01/31 12:34:56 Raw_data/HWCKVBBXX_103373-011-004_GGACTCCT-ATAGAGAG_L001_R1.fastq.gz
+# Depending on the rsync version the size may contain digit separators, which are removed.
+# Returns None when _source does not exist: rsync then exits with 23 (partial transfer)
+# and reports "No such file or directory" for the path.
+#
+def listRemote(_source, _rsh):
+    _command = ['rsync', '-e', _rsh, '--recursive', '--list-only', _source.rstrip('/') + '/']
+    logging.debug('Listing ' + _source + ' with: ' + ' '.join(_command))
+    _result = subprocess.run(_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+    if _result.returncode == 23 and 'No such file or directory' in _result.stderr:
+        return None
+    if _result.returncode != 0:
+        logging.critical('Failed to list ' + _source + ': ' + _result.stderr.strip())
+        sys.exit(EXIT_ERROR)
+    _listing = {}
+    for _line in _result.stdout.splitlines():
+        _fields = _line.split(None, 4)
+        if len(_fields) < 5 or not _fields[0].startswith('-'):
+            continue
+        _perms, _size, _date, _time, _relPath = _fields
+        if isHidden(_relPath):
+            continue
+        _listing[_relPath] = re.sub('[^0-9]', '', _size) + '\t' + _date + 'T' + _time
+    return _listing
+
+#
+# Get the paths of all files listed in a checksum file relative to _source.
+# Example line from MD5 checksum file:
+#     8f246fccfda8ba676b82edc1f66b0006  HWCKVBBXX_103373-011-004_GGACTCCT-ATAGAGAG_L001_R1.fastq.gz
+# Paths in the checksum file are relative to the dir containing the checksum file.
+#
+def readChecksumFile(_source, _checksumRelPath, _rsh):
+    if isRemote(_source):
+        with tempfile.TemporaryDirectory() as _tmpDir:
+            _command = ['rsync', '-e', _rsh, _source.rstrip('/') + '/' + _checksumRelPath, _tmpDir + '/']
+            _result = subprocess.run(_command, stdout=subprocess.PIPE, stderr=subprocess.PIPE, universal_newlines=True)
+            if _result.returncode != 0:
+                logging.critical('Failed to fetch ' + _checksumRelPath + ' from ' + _source + ': ' + _result.stderr.strip())
+                sys.exit(EXIT_ERROR)
+            with open(os.path.join(_tmpDir, os.path.basename(_checksumRelPath)), 'r') as _checksumFileHandle:
+                _lines = _checksumFileHandle.readlines()
+    else:
+        with open(os.path.join(_source, _checksumRelPath), 'r') as _checksumFileHandle:
+            _lines = _checksumFileHandle.readlines()
+    _checksumDir = os.path.dirname(_checksumRelPath)
+    _listedFiles = []
+    for _line in _lines:
+        _m = re.match(r'^[0-9a-fA-F]{32}\s+\*?(.+)$', _line.rstrip('\r\n'))
+        if _m:
+            _listedFiles.append(os.path.normpath(os.path.join(_checksumDir, _m.group(1))))
+    return _listedFiles
+
+#
+# The snapshot is a tab separated file with the state of the previous poll:
+#     status        ready|waiting
+#     stalledPolls  number of consecutive polls without any change while the batch was not ready
+#     file          relative/path      size    mtime
+#     listed        checksums.md5      size    mtime    relative/path/of/listed/file
+# The 'listed' lines cache the content of the checksum files, so these only need to be fetched again when they changed.
+#
+def readSnapshot(_snapshotPath):
+    _status = 'waiting'
+    _stalledPolls = 0
+    _listing = {}
+    _listed = {}
+    if not os.path.isfile(_snapshotPath):
+        return _status, _stalledPolls, _listing, _listed
+    with open(_snapshotPath, 'r') as _snapshotFileHandle:
+        for _line in _snapshotFileHandle:
+            _fields = _line.rstrip('\n').split('\t')
+            if _fields[0] == 'status':
+                _status = _fields[1]
+            elif _fields[0] == 'stalledPolls':
+                _stalledPolls = int(_fields[1])
+            elif _fields[0] == 'file':
+                _listing[_fields[1]] = _fields[2] + '\t' + _fields[3]
+            elif _fields[0] == 'listed':
+                _key = (_fields[1], _fields[2] + '\t' + _fields[3])
+                _listed.setdefault(_key, []).append(_fields[4])
+    return _status, _stalledPolls, _listing, _listed
+
+def writeSnapshot(_snapshotPath, _status, _stalledPolls, _listing, _listed):
+    _tmpSnapshotPath = _snapshotPath + '.tmp'
+    with open(_tmpSnapshotPath, 'w') as _snapshotFileHandle:
+        _snapshotFileHandle.write('status\t' + _status + '\n')
+        _snapshotFileHandle.write('stalledPolls\t' + str(_stalledPolls) + '\n')
+        for _relPath in sorted(_listing):
+            _snapshotFileHandle.write('file\t' + _relPath + '\t' + _listing[_relPath] + '\n')
+        for (_checksumRelPath, _sizeAndMtime), _listedFiles in sorted(_listed.items()):
+            for _listedFile in _listedFiles:
+                _snapshotFileHandle.write('listed\t' + _checksumRelPath + '\t' + _sizeAndMtime + '\t' + _listedFile + '\n')
+    os.rename(_tmpSnapshotPath, _snapshotPath)
+
+#
+##
+### Main
+##
+#
+
+#
+# Get commandline parameters.
+#
+parser = argparse.ArgumentParser(description='Check if a batch has completely arrived: exits with 0 when ready, with 1 when not yet ready, '
+                                             'with 2 on errors or when the batch stalled for too long and with 3 when --source does not exist.')
+parser.add_argument("--source", required=True, help='Batch dir; either a local dir or a remote location that can be listed with rsync (e.g. host::module/batch/Raw_data/).')
+parser.add_argument("--snapshot", required=True, help='File to keep the state of the batch between polls.')
+parser.add_argument("--checksums", required=False, default='checksums.md5', help='File name or pattern of the checksum file(s) listing all files of the batch (default: checksums.md5).')
+parser.add_argument("--maxStalledPolls", type=int, required=False, default=0, help='Exit with 2 when the batch was not ready and did not change for this number of consecutive polls (default: 0 = never).')
+parser.add_argument("--rsh", required=False, default='ssh -p 443', help='Remote shell used by rsync for remote sources (default: ssh -p 443).')
+parser.add_argument("--logLevel" , required=False, default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])
+args = parser.parse_args()
+#
+# Initialize logging.
+#
+numericLogLevel = getattr(logging, args.logLevel.upper(), None)
+if not isinstance(numericLogLevel, int):
+    raise ValueError('Invalid log level specified with --logLevel: %s' % args.logLevel)
+logging.basicConfig(level=numericLogLevel, format='%(filename)s %(asctime)s %(levelname)s @ L:%(lineno)d> %(message)s')
+
+try:
+    #
+    # Once a batch was declared ready there is no need to list it again.
+    #
+    snapshotExisted = os.path.isfile(args.snapshot)
+    previousStatus, previousStalledPolls, previousListing, previousListed = readSnapshot(args.snapshot)
+    if previousStatus == 'ready':
+        logging.info('Batch ' + args.source + ' was already declared ready in ' + args.snapshot + '.')
+        sys.exit(EXIT_READY)
+
+    if isRemote(args.source):
+        listing = listRemote(args.source, args.rsh)
+    elif os.path.isdir(args.source):
+        listing = listLocal(args.source)
+    else:
+        listing = None
+    if listing is None:
+        logging.info(args.source + ' does not exist.')
+        sys.exit(EXIT_SOURCE_MISSING)
+
+    #
+    # Get the list of files that make up the complete batch from the checksum file(s).
+    #
+    checksumRelPaths = sorted([relPath for relPath in listing if fnmatch.fnmatch(os.path.basename(relPath), args.checksums)])
+    listed = {}
+    for checksumRelPath in checksumRelPaths:
+        key = (checksumRelPath, listing[checksumRelPath])
+        if key in previousListed:
+            listed[key] = previousListed[key]
+        else:
+            logging.debug('Fetching new or modified checksum file ' + checksumRelPath + ' ...')
+            listed[key] = readChecksumFile(args.source, checksumRelPath, args.rsh)
+
+    #
+    # The batch is ready when all checksum files and all files listed therein are present
+    # and have the same size and modification time as during the previous poll.
+    #
+    status = 'waiting'
+    requiredRelPaths = set(checksumRelPaths)
+    for listedFiles in listed.values():
+        requiredRelPaths.update(listedFiles)
+    missing = sorted(relPath for relPath in requiredRelPaths if relPath not in listing)
+    unstable = sorted(relPath for relPath in requiredRelPaths if relPath in listing and previousListing.get(relPath) != listing[relPath])
+    if not checksumRelPaths:
+        logging.info('Batch ' + args.source + ' is not ready: no ' + args.checksums + ' file yet.')
+    elif missing:
+        logging.info('Batch ' + args.source + ' is not ready: ' + str(len(missing)) + ' of ' + str(len(requiredRelPaths)) + ' files are missing; e.g. ' + missing[0] + '.')
+    elif unstable:
+        logging.info('Batch ' + args.source + ' is not ready: ' + str(len(unstable)) + ' of ' + str(len(requiredRelPaths)) + ' files are new or still changing; e.g. ' + unstable[0] + '.')
+    else:
+        status = 'ready'
+        logging.info('Batch ' + args.source + ' is ready: all ' + str(len(requiredRelPaths)) + ' files are present and stable.')
+    #
+    # A batch that is not ready, but did not change since the previous poll, has stalled:
+    # e.g. files listed in a checksum file that never arrive or a checksum file that is never uploaded.
+    # Report this, so the batch does not wait silently forever.
+    # Without a snapshot there was no previous poll to compare with: an empty listing cannot have stalled yet.
+    #
+    stalledPolls = 0
+    if status != 'ready' and snapshotExisted and listing == previousListing:
+        stalledPolls = previousStalledPolls + 1
+    writeSnapshot(args.snapshot, status, stalledPolls, listing, listed)
+    if stalledPolls > 0:
+        logging.warning('Batch ' + args.source + ' did not change during the last ' + str(stalledPolls) + ' polls; still missing: '
+                        + (str(len(missing)) + ' files; e.g. ' + missing[0] if missing else args.checksums) + '.')
+        if args.maxStalledPolls > 0 and stalledPolls >= args.maxStalledPolls:
+            logging.critical('Batch ' + args.source + ' stalled for ' + str(stalledPolls) + ' polls (--maxStalledPolls ' + str(args.maxStalledPolls) + ').')
+            sys.exit(EXIT_ERROR)
+    sys.exit(EXIT_READY if status == 'ready' else EXIT_WAITING)
+except (OSError, subprocess.SubprocessError) as err:
+    logging.critical('Failed to check batch ' + args.source + ': ' + str(err))
+    sys.exit(EXIT_ERROR)
+except Exception:
+    logging.exception('Failed to check batch ' + args.source + '.')
+    sys.exit(EXIT_ERROR)
@@ -259,39 +259,39 @@ function sanityCheck() {
 		printf '' > "${_controlFileBaseForFunction}.started"
 	fi
 	
-	#
-	# Count the number of all files produced in this analysis run.
-	#
-	local _countFilesProjectRunDirTmp
-	# shellcheck disable=SC2029
-	_countFilesProjectRunDirTmp=$(ssh "${DATA_MANAGER}"@"${HOSTNAME_TMP}" "find \"${TMP_ROOT_DIAGNOSTICS_DIR}/projects/${pipeline}/${_project}/${_run}/results/\"* -type f -o -type l | wc -l")
-	
 	#
 	# Sanity check.
 	#
-	#  1. Firstly do a quick count of the amount of files to make sure we are complete.
+	#  1. Firstly compare a manifest (path, size, mtime and type) of all files produced in this analysis run on tmp
+	#     with the files on prm to make sure we are complete.
+	#     The manifest is created on tmp in a single walk and compared on prm in a single round trip;
+	#     fileManifest.py is streamed over SSH, so it does not need to be installed on tmp.
 	#     (No need to waist a lot of time on computing checksums for a partially failed transfer).
 	#  2. Secondly verify checksums on the destination.
 	#
-	
-	local _countFilesProjectRunDirPrm
-	_countFilesProjectRunDirPrm=$(find "${PRM_ROOT_DIR}/projects/${_project}/${_run}/results/"* -type f -o -type l | wc -l)
-	if [[ "${_countFilesProjectRunDirTmp}" -ne "${_countFilesProjectRunDirPrm}" ]]
+	# shellcheck disable=SC2029
+	if ! ssh "${DATA_MANAGER}"@"${HOSTNAME_TMP}" "python3 - create --dir \"${TMP_ROOT_DIAGNOSTICS_DIR}/projects/${pipeline}/${_project}/${_run}/results/\"" \
+		< "${INSTALLATION_DIR}/bin/fileManifest.py" \
+		> "${_controlFileBaseForFunction}.tmpManifest.txt"
 	then
-		
-		find "${PRM_ROOT_DIR}/projects/${_project}/${_run}/results/"* -type f -o -type l | sort -V > "${JOB_CONTROLE_FILE_BASE}.countPrmFiles.txt"
-		# shellcheck disable=SC2029
-		ssh "${DATA_MANAGER}"@"${HOSTNAME_TMP}" "find \"${TMP_ROOT_DIAGNOSTICS_DIR}/projects/${pipeline}/${_project}/${_run}/results/\"* -type f -o -type l | sort -V" > "${_controlFileBaseForFunction}.countTmpFiles.txt"
-		
-		echo "diff -q ${_controlFileBaseForFunction}.countPrmFiles.txt ${_controlFileBaseForFunction}.countTmpFiles.txt" >> "${_controlFileBaseForFunction}.started"
-		echo "Ooops! $(date '+%Y-%m-%d-T%H%M'): Amount of files for ${_project}/${_run} on tmp (${_countFilesProjectRunDirTmp}) and prm (${_countFilesProjectRunDirPrm}) is NOT the same!" \
+		echo "Ooops! $(date '+%Y-%m-%d-T%H%M'): Failed to create manifest for ${_project}/${_run} on tmp." \
+			>> "${_controlFileBaseForFunction}.started"
+		log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" '0' \
+			"Failed to create manifest of ${TMP_ROOT_DIAGNOSTICS_DIR}/projects/${pipeline}/${_project}/${_run}/results/ on ${HOSTNAME_TMP}."
+	elif ! "${INSTALLATION_DIR}/bin/fileManifest.py" compare \
+		--dir "${PRM_ROOT_DIR}/projects/${_project}/${_run}/results/" \
+		--manifest "${_controlFileBaseForFunction}.tmpManifest.txt" \
+		--report "${_controlFileBaseForFunction}.manifestDiff.txt" \
+		2>> "${_controlFileBaseForFunction}.started"
+	then
+		echo "Ooops! $(date '+%Y-%m-%d-T%H%M'): Files for ${_project}/${_run} on tmp and prm are NOT the same! See ${_controlFileBaseForFunction}.manifestDiff.txt for missing, extra and mismatched files." \
 			>> "${_controlFileBaseForFunction}.started"
 		log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" '0' \
-			"Amount of files for ${_project}/${_run} on tmp (${_countFilesProjectRunDirTmp}) and prm (${_countFilesProjectRunDirPrm}) is NOT the same!"
+			"Files for ${_project}/${_run} on tmp and prm are NOT the same! See ${_controlFileBaseForFunction}.manifestDiff.txt for details."
 		
 	else
 		log4Bash 'DEBUG' "${LINENO}" "${FUNCNAME:-main}" '0' \
-			"Amount of files on tmp and prm is the same for ${_project}/${_run}: ${_countFilesProjectRunDirPrm}."
+			"Files on tmp and prm are the same for ${_project}/${_run}."
 		#
 		# Verify checksums on prm storage.
 		#
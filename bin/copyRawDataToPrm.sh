@@ -126,23 +126,36 @@ function rsyncRuns() {
 		#
 		# Sanity check.
 		#
-		#  1. Firstly do a quick count of the amount of files to make sure we are complete.
+		#  1. Firstly compare a manifest (path, size, mtime and type) of all files on tmp with the files on prm
+		#     to make sure we are complete. The manifest is created on tmp in a single walk and compared on prm
+		#     in a single round trip; fileManifest.py is streamed over SSH, so it does not need to be installed on tmp.
+		#     Symlinks are followed as rsync -L copies the files they point to.
 		#     (No need to waist a lot of time on computing checksums for a partially failed transfer).
 		#  2. Secondly verify checksums on the destination.
 		#
-		local _countFilesRunDirScr
-		local _countFilesRunDirPrm
 		# shellcheck disable=SC2029
-		_countFilesRunDirScr="$(ssh "${DATA_MANAGER}"@"${sourceServerFQDN}" "find \"${TMP_ROOT_DIR}/rawdata/${_rawDataType}/${_rawDataItem}/\"* -type f | wc -l")"
-		_countFilesRunDirPrm="$(find "${PRM_ROOT_DIR}/rawdata/${_rawDataType}/${_rawDataItem}/"* -type f | wc -l)"
+		if ! ssh "${DATA_MANAGER}"@"${sourceServerFQDN}" "python3 - create --followSymlinks --dir \"${TMP_ROOT_DIR}/rawdata/${_rawDataType}/${_rawDataItem}/\"" \
+			< "${INSTALLATION_DIR}/bin/fileManifest.py" \
+			> "${_controlFileBaseForFunction}.tmpManifest.txt"
+		then
+			log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" '0' \
+				"Failed to create manifest of ${TMP_ROOT_DIR}/rawdata/${_rawDataType}/${_rawDataItem}/ on ${sourceServerFQDN}."
+			mv "${_controlFileBaseForFunction}."{started,failed}
+			return
+		fi
 		local _checksumVerification='unknown'
-		if [[ "${_countFilesRunDirScr}" -ne "${_countFilesRunDirPrm}" ]]; then
+		if ! "${INSTALLATION_DIR}/bin/fileManifest.py" compare --followSymlinks \
+			--dir "${PRM_ROOT_DIR}/rawdata/${_rawDataType}/${_rawDataItem}/" \
+			--manifest "${_controlFileBaseForFunction}.tmpManifest.txt" \
+			--report "${_controlFileBaseForFunction}.manifestDiff.txt" \
+			2>> "${_controlFileBaseForFunction}.started"
+		then
 			log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" '0' \
-				"Amount of files for ${_rawDataItem} on tmp (${_countFilesRunDirScr}) and prm (${_countFilesRunDirPrm}) is NOT the same!"
+				"Files for ${_rawDataItem} on tmp and prm are NOT the same! See ${_controlFileBaseForFunction}.manifestDiff.txt for missing, extra and mismatched files."
 			mv "${_controlFileBaseForFunction}."{started,failed}
 			return
 		else
-			log4Bash 'DEBUG' "${LINENO}" "${FUNCNAME:-main}" '0' "Amount of files on tmp and prm is the same for ${_rawDataItem}: ${_countFilesRunDirPrm}."
+			log4Bash 'DEBUG' "${LINENO}" "${FUNCNAME:-main}" '0' "Files on tmp and prm are the same for ${_rawDataItem}."
 		fi
 		#
 		# Verify checksums on prm storage.
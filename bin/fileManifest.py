@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+
+import os
+import sys
+import stat
+import argparse
+import logging
+
+#
+## functions
+#
+
+#
+# Walk a directory tree once and yield one record per file or symlink:
+#     relative path, size in bytes, modification time (integer seconds since epoch) and type.
+# Directories are not listed: they are implied by the paths of the files they contain.
+# When _followSymlinks is True symlinks are dereferenced and reported as the files they point to,
+# which matches what ends up on the destination when rsync is used with -L / --copy-links.
+#
+def walkTree(_rootDir, _followSymlinks):
+    _rootDir = os.path.normpath(_rootDir)
+    for _dirPath, _dirs, _files in os.walk(_rootDir, followlinks=_followSymlinks):
+        _dirs.sort()
+        #
+        # os.walk lists symlinks to dirs in _dirs, but the rsync commands we mimic
+        # transfer those as symlinks unless symlinks are dereferenced.
+        #
+        if not _followSymlinks:
+            _files = _files + [_dir for _dir in _dirs if os.path.islink(os.path.join(_dirPath, _dir))]
+        for _file in sorted(_files):
+            _path = os.path.join(_dirPath, _file)
+            try:
+                _stat = os.stat(_path) if _followSymlinks else os.lstat(_path)
+            except OSError as _err:
+                logging.warning('Cannot stat ' + _path + ': ' + str(_err))
+                continue
+            if stat.S_ISLNK(_stat.st_mode):
+                _type = 'l'
+            elif stat.S_ISREG(_stat.st_mode):
+                _type = 'f'
+            else:
+                continue
+            yield (os.path.relpath(_path, _rootDir), _stat.st_size, int(_stat.st_mtime), _type)
+
+#
+# Write a manifest as tab separated lines: path, size, mtime, type.
+# Paths containing tabs or newlines cannot be represented and are skipped with a warning.
+#
+def writeManifest(_rootDir, _followSymlinks, _fileHandle):
+    _count = 0
+    for _relPath, _size, _mtime, _type in walkTree(_rootDir, _followSymlinks):
+        if '\t' in _relPath or '\n' in _relPath:
+            logging.warning('Skipping path with tab or newline character: ' + repr(_relPath))
+            continue
+        _fileHandle.write(_relPath + '\t' + str(_size) + '\t' + str(_mtime) + '\t' + _type + '\n')
+        _count += 1
+    return _count
+
+#
+# Parse a manifest into a dict:
+#     {'relative/path': (size, mtime, type), ...}
+#
+def readManifest(_fileHandle):
+    _manifest = {}
+    for _lineNumber, _line in enumerate(_fileHandle, 1):
+        _line = _line.rstrip('\n')
+        if _line == '':
+            continue
+        try:
+            _relPath, _size, _mtime, _type = _line.split('\t')
+            _manifest[_relPath] = (int(_size), int(_mtime), _type)
+        except ValueError:
+            logging.critical('Malformed manifest line ' + str(_lineNumber) + ': ' + repr(_line))
+            sys.exit('FATAL ERROR!')
+    return _manifest
+
+#
+# Compare a source manifest against a walk of the destination dir.
+# Returns three sorted lists: missing paths, extra paths and mismatches:
+#     [('TYPE_MISMATCH|SIZE_MISMATCH|MTIME_MISMATCH', path, sourceValue, destinationValue), ...]
+# Both rsync -a and rsync -rltD preserve modification times (-t), so these are compared too,
+# but only for regular files: times of symlinks are not preserved on all file systems.
+#
+def compareManifest(_sourceManifest, _destinationDir, _followSymlinks):
+    _destinationManifest = {}
+    for _relPath, _size, _mtime, _type in walkTree(_destinationDir, _followSymlinks):
+        _destinationManifest[_relPath] = (_size, _mtime, _type)
+    _missing = sorted(set(_sourceManifest) - set(_destinationManifest))
+    _extra = sorted(set(_destinationManifest) - set(_sourceManifest))
+    _mismatches = []
+    for _relPath in sorted(set(_sourceManifest) & set(_destinationManifest)):
+        _sourceSize, _sourceMtime, _sourceType = _sourceManifest[_relPath]
+        _destinationSize, _destinationMtime, _destinationType = _destinationManifest[_relPath]
+        if _sourceType != _destinationType:
+            _mismatches.append(('TYPE_MISMATCH', _relPath, _sourceType, _destinationType))
+        elif _sourceSize != _destinationSize:
+            _mismatches.append(('SIZE_MISMATCH', _relPath, _sourceSize, _destinationSize))
+        elif _sourceType == 'f' and _sourceMtime != _destinationMtime:
+            _mismatches.append(('MTIME_MISMATCH', _relPath, _sourceMtime, _destinationMtime))
+    return _missing, _extra, _mismatches
+
+#
+# Check for argparse input validation: check if input is dir and if we have read permission.
+#
+def readableDir(prospectiveDir):
+    if not os.path.isdir(prospectiveDir):
+        raise argparse.ArgumentTypeError("readableDir: {0} is not a valid path".format(prospectiveDir))
+    if os.access(prospectiveDir, os.R_OK):
+        return prospectiveDir
+    else:
+        raise argparse.ArgumentTypeError("readableDir: {0} is not a readable dir".format(prospectiveDir))
+
+#
+##
+### Main
+##
+#
+
+#
+# Get commandline parameters.
+#
+# Typical use to compare data on tmp with data on prm in a single SSH round trip
+# (the script is streamed over SSH, so it does not need to be installed on the source server):
+#     ssh user@tmpServer "python3 - create --dir /path/on/tmp/" < fileManifest.py > manifest.tsv
+#     fileManifest.py compare --dir /path/on/prm/ --manifest manifest.tsv --report diff.txt
+#
+parser = argparse.ArgumentParser(description='Create a manifest of all files in a dir or compare a dir against a previously created manifest.')
+subparsers = parser.add_subparsers(dest='command')
+subparsers.required = True
+createParser = subparsers.add_parser('create', help='Write manifest (path, size, mtime, type) of all files and symlinks in --dir to STDOUT.')
+createParser.add_argument("--dir", type=readableDir, required=True, help='Root dir; paths in the manifest are relative to this dir.')
+compareParser = subparsers.add_parser('compare', help='Compare --dir against --manifest and report missing, extra and mismatched (type, size or mtime) files.')
+compareParser.add_argument("--dir", type=readableDir, required=True, help='Root dir to compare against the manifest.')
+compareParser.add_argument("--manifest", required=True, help='Manifest created with the create command or - for STDIN.')
+compareParser.add_argument("--report", required=False, help='Write differences as tab separated lines to this file.')
+for subparser in (createParser, compareParser):
+    subparser.add_argument("--followSymlinks", action='store_true', help='Report symlinks as the files they point to (use when data was transferred with rsync -L).')
+    subparser.add_argument("--logLevel" , required=False, default='INFO', choices=['DEBUG', 'INFO', 'WARNING', 'ERROR', 'CRITICAL'])
+args = parser.parse_args()
+#
+# Initialize logging; log to STDERR as STDOUT may be used for the manifest.
+#
+numericLogLevel = getattr(logging, args.logLevel.upper(), None)
+if not isinstance(numericLogLevel, int):
+    raise ValueError('Invalid log level specified with --logLevel: %s' % args.logLevel)
+logging.basicConfig(stream=sys.stderr, level=numericLogLevel, format='%(filename)s %(asctime)s %(levelname)s @ L:%(lineno)d> %(message)s')
+
+if args.command == 'create':
+    count = writeManifest(args.dir, args.followSymlinks, sys.stdout)
+    logging.info('Listed ' + str(count) + ' files in manifest for ' + args.dir + '.')
+    sys.exit(0)
+
+#
+# Compare.
+#
+if args.manifest == '-':
+    sourceManifest = readManifest(sys.stdin)
+else:
+    with open(args.manifest, 'r') as manifestFileHandle:
+        sourceManifest = readManifest(manifestFileHandle)
+missing, extra, mismatches = compareManifest(sourceManifest, args.dir, args.followSymlinks)
+reportLines = []
+for relPath in missing:
+    reportLines.append('MISSING\t' + relPath)
+for relPath in extra:
+    reportLines.append('EXTRA\t' + relPath)
+for kind, relPath, sourceValue, destinationValue in mismatches:
+    reportLines.append(kind + '\t' + relPath + '\t' + str(sourceValue) + '\t' + str(destinationValue))
+if args.report:
+    with open(args.report, 'w') as reportFileHandle:
+        reportFileHandle.write(''.join(line + '\n' for line in reportLines))
+for line in reportLines:
+    logging.debug(line)
+summary = ('files in manifest: ' + str(len(sourceManifest)) + ', missing: ' + str(len(missing))
+           + ', extra: ' + str(len(extra)) + ', type, size or mtime mismatch: ' + str(len(mismatches)) + '.')
+if reportLines:
+    logging.error('Content of ' + args.dir + ' does NOT match manifest; ' + summary)
+    sys.exit(1)
+else:
+    logging.info('Content of ' + args.dir + ' matches manifest; ' + summary)
+    sys.exit(0)
@@ -187,6 +187,15 @@ thereShallBeOnlyOne "${lockFile}"
 log4Bash 'DEBUG' "${LINENO}" "${FUNCNAME:-main}" '0' "Successfully got exclusive access to lock file ${lockFile} ..."
 log4Bash 'DEBUG' "${LINENO}" "${FUNCNAME:-main}" '0' "Log files will be written to ${DAT_ROOT_DIR}/logs ..."
 
+#
+# checkBarcodeCollisions.py requires NumPy, which is provided by the SciPy-bundle module.
+# The version depends on the toolchain of the server and is therefore set in the server specific config.
+# Without NumPy none of the samplesheets for in-house sequencing runs can be checked,
+# so fail once here instead of marking each of those samplesheets failed.
+#
+module load "SciPy-bundle/${SCIPY_BUNDLE_VERSION}" || log4Bash 'FATAL' "${LINENO}" "${FUNCNAME:-main}" "${?}" 'Failed to load SciPy-bundle module.'
+log4Bash 'DEBUG' "${LINENO}" "${FUNCNAME:-main}" '0' "$(module list 2>&1)"
+
 #
 # Define timestamp per day for a log file per day.
 #
@@ -281,6 +290,34 @@ else
 				mv -v "${JOB_CONTROLE_FILE_BASE}."{started,failed}
 				continue
 			fi
+			#
+			# Check if samples in the same lane have indexes that are too similar to demultiplex,
+			# before we waste a demultiplexing run on it.
+			#
+			if [[ "${projectSamplesheet}" == "false" ]]
+			then
+				#
+				# Exit status 1 means barcode collisions; any other non-zero exit status means the check itself failed.
+				#
+				barcodeCheckExitStatus='0'
+				checkBarcodeCollisions.py --input "${samplesheet}" --log "${samplesheet}.barcodes.log" --sep "${SAMPLESHEET_SEP}" \
+					|| barcodeCheckExitStatus="${?}"
+				if [[ "${barcodeCheckExitStatus}" -eq '0' ]]
+				then
+					log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' "Samplesheet ${samplesheet} has no barcode collisions."
+				else
+					check=$(cat "${samplesheet}.barcodes.log" 2>/dev/null || true)
+					if [[ "${barcodeCheckExitStatus}" -eq '1' ]]
+					then
+						log4Bash 'INFO' "${LINENO}" "${FUNCNAME:-main}" '0' "Samplesheet ${samplesheet} contains barcode collisions."
+						log4Bash 'WARN' "${LINENO}" "${FUNCNAME:-main}" '0' "${check} for samplesheet: ${samplesheet}"
+					else
+						log4Bash 'ERROR' "${LINENO}" "${FUNCNAME:-main}" "${barcodeCheckExitStatus}" "Failed to check samplesheet ${samplesheet} for barcode collisions: ${check:-no log file}"
+					fi
+					mv -v "${JOB_CONTROLE_FILE_BASE}."{started,failed}
+					continue
+				fi
+			fi
 		fi
 	
 		if [[ -n "${_sampleSheetColumnOffsets["${PIPELINECOLUMN}"]+isset}" ]] 